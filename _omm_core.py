@@ -0,0 +1,116 @@
+'''
+Conversion factors and OMM output shared by the FRCMOD and LAMMPS
+converters. Both formats give bonded parameters in kcal/mol, Angstrom
+and degrees, so the arithmetic is the same once a line has been parsed.
+    1. HarmonicBondForce
+    2. HarmonicAngleForce
+    3. PeriodicTorsionForce: Proper
+
+Each force has a per-line function and a block version taking whole
+columns of parsed values.
+
+@author: Madhuranga Rathnayake
+'''
+
+import math
+
+kcal2kj       = 4.184          # 1 kcal = 4.184 kj
+ang2nm        = 0.1
+
+# combined conversion factors, evaluated once at import
+DEG2RAD         = math.pi/180.0                  # degree -> rad
+BOND_K_FACTOR   = 2.0*kcal2kj/(ang2nm*ang2nm)    # kcal/mol/A**2 -> 2*kj/mol/nm**2 (836.8)
+ANGLE_K_FACTOR  = 2.0*kcal2kj                    # kcal/mol/rad**2 -> 2*kj/mol/rad**2 (8.368)
+
+# output templates, bound once and shared by the per-line and block functions
+_BOND_FMT     = '<Bond type1="{}" type2="{}" length="{}" k="{}"/>'.format
+_ANGLE_FMT    = '<Angle type1="{}" type2="{}" type3="{}" angle="{}" k="{}"/>'.format
+_PROPER_FMT   = '<Proper type1="{}" type2="{}" type3="{}" type4="{}" periodicity1="{}" phase1="{}" k1="{}"/>'.format
+
+
+def bond_xml(t1, t2, k, r):
+    """(str, str, float, float) -> str
+    Parameters: atom types, K: kcal/mol/(A**2), r: Ang
+    Return    : OMM <Bond/>
+        K: kcal/mol/(A**2)  ->  K/2: 2*kj/mol/nm**2
+        r: Ang              ->  nm
+
+    >>> bond_xml('c3', 'h1', 330.6, 1.097)
+    '<Bond type1="c3" type2="h1" length="0.1097" k="276646.07999999996"/>'
+    """
+    return(_BOND_FMT(t1, t2, r*ang2nm, k*BOND_K_FACTOR))
+
+
+def angle_xml(t1, t2, t3, k, a):
+    """(str, str, str, float, float) -> str
+    Parameters: atom types, K: kcal/mol/(rad**2), a: degrees
+    Return    : OMM <Angle/>
+        K: kcal/mol/(rad**2)  ->  K/2: 2*kj/mol/(rad**2)
+        a: degrees            ->  rad
+
+    >>> angle_xml('c3', 'n', 'c3', 63.03, 115.64)
+    '<Angle type1="c3" type2="n" type3="c3" angle="2.018298747006243" k="527.4350400000001"/>'
+    """
+    return(_ANGLE_FMT(t1, t2, t3, a*DEG2RAD, k*ANGLE_K_FACTOR))
+
+
+def dihedral_xml(t1, t2, t3, t4, k, periodicity, phase):
+    """(str, str, str, str, float, int, float) -> str
+    Parameters: atom types, K: kcal/mol, periodicity, phase: degrees
+    Return    : OMM <Proper/>
+        K: kcal/mol      ->  K: kj/mol
+        phase: degrees   ->  rad
+
+    >>> dihedral_xml('h1', 'c3', 'n', 'c3', 0.155, 3, 180.0)
+    '<Proper type1="h1" type2="c3" type3="n" type4="c3" periodicity1="3" phase1="3.141592653589793" k1="0.64852"/>'
+    """
+    return(_PROPER_FMT(t1, t2, t3, t4, periodicity, phase*DEG2RAD, k*kcal2kj))
+
+
+def bond_xml_batch(t1, t2, k, r):
+    """(list:str, list:str, list:float, list:float) -> list:str
+    Block version of bond_xml(). Takes whole columns, converts each column
+    in one pass and formats the results in a second one.
+
+    >>> rows = [('c3', 'h1', 330.6, 1.097), ('c', 'c3', 328.3, 1.508)]
+    >>> bond_xml_batch(*zip(*rows)) == [bond_xml(*row) for row in rows]
+    True
+    """
+    omm_k  = [x*BOND_K_FACTOR for x in k]
+    omm_r  = [x*ang2nm for x in r]
+
+    return(list(map(_BOND_FMT, t1, t2, omm_r, omm_k)))
+
+
+def angle_xml_batch(t1, t2, t3, k, a):
+    """(list:str, list:str, list:str, list:float, list:float) -> list:str
+    Block version of angle_xml(), see bond_xml_batch().
+
+    >>> rows = [('c3', 'n', 'c3', 63.03, 115.64), ('h1', 'c3', 'n', 49.57, 109.5)]
+    >>> angle_xml_batch(*zip(*rows)) == [angle_xml(*row) for row in rows]
+    True
+    """
+    omm_k  = [x*ANGLE_K_FACTOR for x in k]
+    omm_a  = [x*DEG2RAD for x in a]
+
+    return(list(map(_ANGLE_FMT, t1, t2, t3, omm_a, omm_k)))
+
+
+def dihedral_xml_batch(t1, t2, t3, t4, k, periodicity, phase):
+    """(list:str, ..., list:float, list:int, list:float) -> list:str
+    Block version of dihedral_xml(), see bond_xml_batch().
+
+    >>> rows = [('h1', 'c3', 'n', 'c3', 0.155, 3, 180.0), ('c', 'c3', 'n', 'c3', 1.1, 2, 0.0)]
+    >>> dihedral_xml_batch(*zip(*rows)) == [dihedral_xml(*row) for row in rows]
+    True
+    """
+    omm_k     = [x*kcal2kj for x in k]
+    omm_phase = [x*DEG2RAD for x in phase]
+
+    return(list(map(_PROPER_FMT, t1, t2, t3, t4, periodicity, omm_phase, omm_k)))
+
+
+# do automate testing when running this script.
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod(verbose=True)
@@ -12,10 +12,60 @@ conversion. Following parameters can be converted with this script.
 
 
 import math
+import re
+from operator import truediv
 
-radian2degree = 57.2957795130  # 1 rad  = 57.2957795130 degree
-kcal2kj       = 4.184          # 1 kcal = 4.184 kj
-ang2nm        = 0.1
+import _omm_core as omm
+from _omm_core import kcal2kj, ang2nm, DEG2RAD
+
+sqrt62        = math.pow(2, 1/6)  # rmin = 2**(1/6) * sigma
+
+# nonbonded factors. bonds, angles and propers share theirs with LAMMPS,
+# see _omm_core
+_NB_SIGMA_FACTOR = ang2nm*2.0/sqrt62              # rmin/2 (A) -> sigma (nm)
+_NB_EPS_FACTOR   = kcal2kj                        # kcal/mol -> kj/mol
+
+# templates for the FRCMOD-only terms
+_IMPROPER_FMT = '<Improper type1="{}" type2="{}" type3="{}" type4="{}" periodicity1="{}" phase1="{}" k1="{}"/>'.format
+_ATOM_FMT     = '<Atom type="{}" charge="XXXX" sigma="{}" epsilon="{}"/>'.format
+
+# fixed-column records: dash separated atom types followed by parameters
+_BOND_RE     = re.compile(r'\s*([^\s-]+)\s*-\s*([^\s-]+)\s+(\S+)\s+(\S+)')
+_ANGLE_RE    = re.compile(r'\s*([^\s-]+)\s*-\s*([^\s-]+)\s*-\s*([^\s-]+)\s+(\S+)\s+(\S+)')
+_DIHEDRAL_RE = re.compile(r'\s*([^\s-]+)\s*-\s*([^\s-]+)\s*-\s*([^\s-]+)\s*-\s*([^\s-]+)'
+                          r'\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)')
+_IMPROPER_RE = re.compile(r'\s*([^\s-]+)\s*-\s*([^\s-]+)\s*-\s*([^\s-]+)\s*-\s*([^\s-]+)'
+                          r'\s+(\S+)\s+(\S+)\s+(\S+)')
+
+
+def _match(regex, line):
+    """(re.Pattern, str) -> tuple
+    Match a record against one of the regexes above and return its groups.
+    Raises ValueError naming the line if it does not have the expected form.
+    """
+    match = regex.match(line)
+    if match is None:
+        raise ValueError(f'malformed FRCMOD record: {line!r}')
+    return(match.groups())
+
+
+def _bond_numeric(line):
+    """(str) -> tuple
+    Parameters: str: processed line from .frcmod file
+    Return    : atom types and raw (unconverted) parameters
+        (t1, t2, K, r)  K: kcal/mol/(A**2), r: Ang
+
+    >>> _bond_numeric('c3-h1  330.60   1.097')
+    ('c3', 'h1', 330.6, 1.097)
+    >>> _bond_numeric('c -c3  328.30   1.508')
+    ('c', 'c3', 328.3, 1.508)
+    >>> _bond_numeric('c3-h1  330.60')
+    Traceback (most recent call last):
+        ...
+    ValueError: malformed FRCMOD record: 'c3-h1  330.60'
+    """
+    t1, t2, k, r = _match(_BOND_RE, line)
+    return(t1, t2, float(k), float(r))
 
 
 def _bond(line):
@@ -27,20 +77,17 @@ def _bond(line):
     ----
     c3-h1  330.60   1.097
     """
-    atoms = line[:5].replace('-', ' ').split()
-    params = line[5:].split()
-    k     = float(params[0])
-    r     = float(params[1])
-
-    omm_t1 = atoms[0]
-    omm_t2 = atoms[1]
-    omm_k  = 2*k*kcal2kj/(ang2nm*ang2nm)
-    omm_r  = r*ang2nm
-
-    omm_out = '<Bond type1="{}" type2="{}" length="{}" k="{}"/>'.format(omm_t1, omm_t2, omm_r, omm_k)
-    
-    print(omm_out)
-    return(omm_out)
+    return(omm.bond_xml(*_bond_numeric(line)))
+
+
+def _angle_numeric(line):
+    """(str) -> tuple
+    Parameters: str: processed line from .frcmod file
+    Return    : atom types and raw (unconverted) parameters
+        (t1, t2, t3, K, a)  K: kcal/mol/(rad**2), a: degrees
+    """
+    t1, t2, t3, k, a = _match(_ANGLE_RE, line)
+    return(t1, t2, t3, float(k), float(a))
 
 
 def _angle(line):
@@ -52,21 +99,17 @@ def _angle(line):
     ----
     c3-n -c3   63.030     115.640
     """
-    atoms  = line[:8].replace('-', ' ').split()
-    params = line[8:].split()
-    k      = float(params[0])
-    a      = float(params[1])
-
-    omm_t1 = atoms[0]
-    omm_t2 = atoms[1]
-    omm_t3 = atoms[2]
-    omm_k  = 2*k*kcal2kj
-    omm_a  = math.radians(a)
+    return(omm.angle_xml(*_angle_numeric(line)))
 
-    omm_out = '<Angle type1="{}" type2="{}" type3="{}" angle="{}" k="{}"/>'.format(omm_t1, omm_t2, omm_t3, omm_a, omm_k)
 
-    print(omm_out)
-    return(omm_out)
+def _dihedral_numeric(line):
+    """(str) -> tuple
+    Parameters: str: processed line from .frcmod file
+    Return    : atom types and raw (unconverted) parameters
+        (t1, t2, t3, t4, IDIVF, PK, phase, PN)  PK: kcal, phase: degrees
+    """
+    t1, t2, t3, t4, idivf, pk, phase, pn = _match(_DIHEDRAL_RE, line)
+    return(t1, t2, t3, t4, float(idivf), float(pk), float(phase), float(pn))
 
 
 def _dihedral(line):
@@ -78,26 +121,28 @@ def _dihedral(line):
     ----
     h1-c3-n -c3   6    0.000         0.000           2.000
     """
-    atoms  = line[:11].replace('-', ' ').split()
-    params = line[11:].split()
-    idivf  = float(params[0])
-    pk     = float(params[1])
-    phase  = float(params[2])
-    pn     = float(params[3])
-
-    omm_t1 = atoms[0]
-    omm_t2 = atoms[1]
-    omm_t3 = atoms[2]
-    omm_t4 = atoms[3]
-    omm_k  = (pk/idivf) * kcal2kj
-    omm_phase = math.radians(phase)
-    omm_pn = int(pn)
+    t1, t2, t3, t4, idivf, pk, phase, pn = _dihedral_numeric(line)
 
-    omm_out = '<Proper type1="{}" type2="{}" type3="{}" type4="{}" periodicity1="{}" phase1="{}" k1="{}"/>'.format(omm_t1, omm_t2, omm_t3, omm_t4, omm_pn, omm_phase, omm_k)
+    return(omm.dihedral_xml(t1, t2, t3, t4, pk/idivf, int(pn), phase))
 
-    print(omm_out)
-    return(omm_out)
 
+def _improper_numeric(line):
+    """(str) -> tuple
+    Parameters: str: processed line from .frcmod file
+    Return    : atom types in file order and raw (unconverted) parameters
+        (t1, t2, t3, t4, K, phase, PN)  K: kcal, phase: degrees
+
+    >>> _improper_numeric('c -c3-n -c3         1.1          180.0         2.0')
+    ('c', 'c3', 'n', 'c3', 1.1, 180.0, 2.0)
+    >>> _improper_numeric('X -c -c3-X          1.1          180.0         2.0')
+    ('X', 'c', 'c3', 'X', 1.1, 180.0, 2.0)
+    >>> _improper_numeric('c -c3-n  1.1  180.0  2.0')
+    Traceback (most recent call last):
+        ...
+    ValueError: malformed FRCMOD record: 'c -c3-n  1.1  180.0  2.0'
+    """
+    t1, t2, t3, t4, k, phase, pn = _match(_IMPROPER_RE, line)
+    return(t1, t2, t3, t4, float(k), float(phase), float(pn))
 
 
 def _improper(line):
@@ -111,27 +156,28 @@ def _improper(line):
           ^
       out of plane
     """
-    atoms  = line[:11].replace('-', ' ').split()
-    params = line[11:].split()
-    k      = float(params[0])
-    phase  = float(params[1])
-    pn     = float(params[2])
-
-    omm_t1 = atoms[2]  # this is the one in out-of-plane. must go 1st in OMM
-    omm_t2 = atoms[0]
-    omm_t3 = atoms[1]
-    omm_t4 = atoms[3]
+    # 3rd atom is the one in out-of-plane. must go 1st in OMM
+    omm_t2, omm_t3, omm_t1, omm_t4, k, phase, pn = _improper_numeric(line)
 
     omm_k = k*kcal2kj
-    omm_p = math.radians(phase)
+    omm_p = phase*DEG2RAD
     omm_pn = int(pn)
 
-    omm_out = '<Improper type1="{}" type2="{}" type3="{}" type4="{}" periodicity1="{}" phase1="{}" k1="{}"/>'.format(omm_t1, omm_t2, omm_t3, omm_t4, omm_pn, omm_p, omm_k)
+    omm_out = _IMPROPER_FMT(omm_t1, omm_t2, omm_t3, omm_t4, omm_pn, omm_p, omm_k)
 
-    print(omm_out)
     return(omm_out)
 
 
+def _nonbonding_numeric(line):
+    """(str) -> tuple
+    Parameters: str: processed line from .frcmod file
+    Return    : atom type and raw (unconverted) parameters
+        (t1, rmin/2, epsilon)  rmin/2: Ang, epsilon: kcal/mol
+    """
+    llist = line.split()
+    return(llist[0], float(llist[1]), float(llist[2]))
+
+
 def _nonbonding(line):
     """(list:str) -> str
     Parameters: list: processed line from .frcmod file
@@ -141,18 +187,92 @@ def _nonbonding(line):
     ----
     c3          1.9080  0.1094
     """  
-    llist = line.split()
-    sqrt62 = math.pow(2, 1/6)
-
-    atom_t1  = llist[0]
-    rmin2    = float(llist[1])
-    epsilon  = float(llist[2]) 
+    atom_t1, rmin2, epsilon = _nonbonding_numeric(line)
 
-    omm_sigma   = ang2nm * 2 * rmin2 / sqrt62
-    omm_epsilon = kcal2kj * epsilon
+    omm_sigma   = rmin2 * _NB_SIGMA_FACTOR
+    omm_epsilon = epsilon * _NB_EPS_FACTOR
 
-    omm_out = '<Atom type="{}" charge="XXXX" sigma="{}" epsilon="{}"/>'.format(atom_t1, omm_sigma, omm_epsilon)
+    omm_out = _ATOM_FMT(atom_t1, omm_sigma, omm_epsilon)
 
-    print(omm_out)
     return(omm_out)
 
+
+def _bond_batch(lines):
+    """(list:str) -> str
+    Block version of _bond(). Converts the whole BOND block in one call:
+    all lines are parsed first, the unit conversions are then done per
+    column and the results are formatted in a separate pass.
+    Parameters: list: processed BOND lines from .frcmod file
+    Return    : converted lines, one OMM <Bond/> per line
+    """
+    if not lines:
+        return('')
+    return('\n'.join(omm.bond_xml_batch(*zip(*map(_bond_numeric, lines)))))
+
+
+def _angle_batch(lines):
+    """(list:str) -> str
+    Block version of _angle(). Converts the whole ANGLE block in one call,
+    see _bond_batch().
+    Parameters: list: processed ANGLE lines from .frcmod file
+    Return    : converted lines, one OMM <Angle/> per line
+    """
+    if not lines:
+        return('')
+    return('\n'.join(omm.angle_xml_batch(*zip(*map(_angle_numeric, lines)))))
+
+
+def _dihedral_batch(lines):
+    """(list:str) -> str
+    Block version of _dihedral(). Converts the whole DIHE block in one call,
+    see _bond_batch().
+    Parameters: list: processed DIHE lines from .frcmod file
+    Return    : converted lines, one OMM <Proper/> per line
+    """
+    if not lines:
+        return('')
+    t1, t2, t3, t4, idivf, pk, phase, pn = zip(*map(_dihedral_numeric, lines))
+
+    return('\n'.join(omm.dihedral_xml_batch(t1, t2, t3, t4, map(truediv, pk, idivf),
+                                             map(int, pn), phase)))
+
+
+def _improper_batch(lines):
+    """(list:str) -> str
+    Block version of _improper(). Converts the whole IMPROPER block in one
+    call, see _bond_batch().
+    Parameters: list: processed IMPROPER lines from .frcmod file
+    Return    : converted lines, one OMM <Improper/> per line
+    """
+    if not lines:
+        return('')
+    # 3rd atom is the one in out-of-plane. must go 1st in OMM
+    omm_t2, omm_t3, omm_t1, omm_t4, k, phase, pn = zip(*map(_improper_numeric, lines))
+
+    omm_k  = [x*kcal2kj for x in k]
+    omm_p  = [x*DEG2RAD for x in phase]
+    omm_pn = list(map(int, pn))
+
+    return('\n'.join(map(_IMPROPER_FMT, omm_t1, omm_t2, omm_t3, omm_t4, omm_pn, omm_p, omm_k)))
+
+
+def _nonbonding_batch(lines):
+    """(list:str) -> str
+    Block version of _nonbonding(). Converts the whole NONBON block in one
+    call, see _bond_batch().
+    Parameters: list: processed NONBON lines from .frcmod file
+    Return    : converted lines, one OMM <Atom/> per line
+    """
+    if not lines:
+        return('')
+    atom_t1, rmin2, epsilon = zip(*map(_nonbonding_numeric, lines))
+
+    omm_sigma   = [x*_NB_SIGMA_FACTOR for x in rmin2]
+    omm_epsilon = [x*_NB_EPS_FACTOR for x in epsilon]
+
+    return('\n'.join(map(_ATOM_FMT, atom_t1, omm_sigma, omm_epsilon)))
+
+# do automate testing when running this script.
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod(verbose=True)
@@ -12,11 +12,8 @@ of MYP type potentials parameters to OpenMM.
 @author: Madhuranga Rathnayake
 '''
 
-import math
-
-radian2degree = 57.2957795130  # 1 rad  = 57.2957795130 degree
-kcal2kj       = 4.184          # 1 kcal = 4.184 kj
-ang2nm        = 0.1
+import _omm_core as omm
+from _omm_core import kcal2kj, ang2nm
 
 # grey colour bash text variable. marks unconverted lines in less pronounced light grey colour.
 CGREY = '\33[90m'
@@ -37,18 +34,11 @@ def _bond(line):
                    K                         r
     """
     llist     = line.split()
-    # bond_type = llist[1]
     atoms = llist[5].split('-')
     k         = float(llist[2])
     r         = float(llist[3])
 
-    omm_k  = k * 2*kcal2kj/(ang2nm*ang2nm)
-    omm_r  = r * ang2nm
-
-    omm_out = '<Bond type1="{}" type2="{}" length="{}" k="{}"/>'.format(atoms[0], atoms[1], omm_r, omm_k)
-    
-    print(omm_out)
-    return(omm_out)
+    return(omm.bond_xml(atoms[0], atoms[1], k, r))
 
 
 def _angle(line):
@@ -68,16 +58,7 @@ def _angle(line):
     k      = float(llist[2])
     a      = float(llist[3])
 
-    omm_t1 = atoms[0]
-    omm_t2 = atoms[1]
-    omm_t3 = atoms[2]
-    omm_k  = 2*k*kcal2kj
-    omm_a  = math.radians(a)
-
-    omm_out = '<Angle type1="{}" type2="{}" type3="{}" angle="{}" k="{}"/>'.format(omm_t1, omm_t2, omm_t3, omm_a, omm_k)
-
-    print(omm_out)
-    return(omm_out)
+    return(omm.angle_xml(atoms[0], atoms[1], atoms[2], k, a))
 
 
 def _dihedral(line):
@@ -104,18 +85,7 @@ def _dihedral(line):
     periodicity = int(llist[3]) 
     phaseoffset = int(llist[4])
 
-    omm_t1 = atoms[0]
-    omm_t2 = atoms[1]
-    omm_t3 = atoms[2]
-    omm_t4 = atoms[3]
-    omm_k  = k * kcal2kj
-    omm_periodicity = periodicity
-    omm_phaseoffset = math.radians(phaseoffset)    
-
-    omm_out = '<Proper type1="{}" type2="{}" type3="{}" type4="{}" periodicity1="{}" phase1="{}" k1="{}"/>'.format(omm_t1, omm_t2, omm_t3, omm_t4, omm_periodicity, omm_phaseoffset, omm_k)
-
-    print(omm_out)
-    return(omm_out)
+    return(omm.dihedral_xml(atoms[0], atoms[1], atoms[2], atoms[3], k, periodicity, phaseoffset))
 
 
 def _nonbonding(line):
@@ -141,22 +111,77 @@ def _nonbonding(line):
     omm_epsilon = kcal2kj * epsilon
 
     # only output LJ pairs with same atom type
+    # unconverted pairs are returned greyed out, together with converted values
     if atom_type1 == atom_type2 and llist[3].startswith("lj"):
         atom_type2_name = llist[7].split('-')[1]
-        omm_out = '<Atom type="{}" charge="XXXX" sigma="{}" epsilon="{}"/>'.format(atom_type2_name, omm_sigma, omm_epsilon)
-        print(omm_out)
+        omm_out = [f'<Atom type="{atom_type2_name}" charge="XXXX" sigma="{omm_sigma}" epsilon="{omm_epsilon}"/>']
     elif atom_type1 != atom_type2 and llist[3].startswith("lj"):
-        print(CGREY + line.strip() + CEND)
-        print(CYLW+"    {}   omm_sigma={}   omm_epsilon={}".format(llist[7], omm_sigma, omm_epsilon)+CEND)
-        omm_out=""
+        omm_out = [CGREY + line.strip() + CEND,
+                   CYLW+f"    {llist[7]}   omm_sigma={omm_sigma}   omm_epsilon={omm_epsilon}"+CEND]
     else:
-        print(CGREY + line.strip() + CEND)
-        omm_out=""
+        omm_out = [CGREY + line.strip() + CEND]
 
     if atom_type1 == atom_type2 and llist[3].startswith("buck"):
         atom_type2_name = llist[8].split('-')[1]
-        omm_buck = '<Atom type="{}" charge="XXXX" sigma="0.0" epsilon="0.0"/>'.format(atom_type2_name)
-        print(omm_buck)    
-    
-    return(omm_out)
+        omm_buck = f'<Atom type="{atom_type2_name}" charge="XXXX" sigma="0.0" epsilon="0.0"/>'
+        omm_out.append(omm_buck)
+
+    return('\n'.join(omm_out))
+
+
+def _bond_batch(lines):
+    """(list:str) -> list:str
+    Block version of _bond(). All bond_coeff lines are parsed first, unit
+    conversions and formatting are then done column-wise, see _omm_core.
+    Parameters: list: processed bond_coeff lines from lammps param file
+    Return    : converted lines, one OMM <Bond/> per input line
+    """
+    llists = [line.split() for line in lines]
+    atoms  = [l[5].split('-') for l in llists]
 
+    t1 = [a[0] for a in atoms]
+    t2 = [a[1] for a in atoms]
+    k  = [float(l[2]) for l in llists]
+    r  = [float(l[3]) for l in llists]
+
+    return(omm.bond_xml_batch(t1, t2, k, r))
+
+
+def _angle_batch(lines):
+    """(list:str) -> list:str
+    Block version of _angle(). All angle_coeff lines are parsed first, unit
+    conversions and formatting are then done column-wise, see _omm_core.
+    Parameters: list: processed angle_coeff lines from lammps param file
+    Return    : converted lines, one OMM <Angle/> per input line
+    """
+    llists = [line.split() for line in lines]
+    atoms  = [l[5].split('-') for l in llists]
+
+    t1 = [a[0] for a in atoms]
+    t2 = [a[1] for a in atoms]
+    t3 = [a[2] for a in atoms]
+    k  = [float(l[2]) for l in llists]
+    a  = [float(l[3]) for l in llists]
+
+    return(omm.angle_xml_batch(t1, t2, t3, k, a))
+
+
+def _dihedral_batch(lines):
+    """(list:str) -> list:str
+    Block version of _dihedral(). All dihedral_coeff lines are parsed first,
+    unit conversions and formatting are then done column-wise, see _omm_core.
+    Parameters: list: processed dihedral_coeff lines from lammps param file
+    Return    : converted lines, one OMM <Proper/> per input line
+    """
+    llists = [line.split() for line in lines]
+    atoms  = [l[7].split('-') for l in llists]
+
+    t1 = [a[0] for a in atoms]
+    t2 = [a[1] for a in atoms]
+    t3 = [a[2] for a in atoms]
+    t4 = [a[3] for a in atoms]
+    k  = [float(l[2]) for l in llists]
+    periodicity = [int(l[3]) for l in llists]
+    phaseoffset = [int(l[4]) for l in llists]
+
+    return(omm.dihedral_xml_batch(t1, t2, t3, t4, k, periodicity, phaseoffset))
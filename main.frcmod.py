@@ -15,6 +15,7 @@ USAGE: script.py <lig.frcmod>
 """
 
 import frcmod2omm as fmm
+import io
 import sys
 
 # check system arguments and extract input frcmod parameter file
@@ -27,56 +28,59 @@ else:
     sys.exit()
 
 
-def extract(fname, component):
-    """(str: full line) -> list
-    extract components from frcmod file
+def extract(fname):
+    """(str: file name) -> dict
+    extract all components from frcmod file in a single pass. a component
+    starts after the line beginning with its header (BOND, ANGLE, DIHE, ...)
+    and ends at the next empty line.
     """
-    llist       = []
-    empty_lines = 0
+    sections = {"BOND": [], "ANGLE": [], "DIHE": [], "IMPROPER": [], "NONBON": []}
+    current  = None
 
-    ffrcmod = open(fname, 'r')
+    # read and decode the whole file at once, then walk its lines
+    with open(fname, 'r') as ffrcmod:
+        lines = ffrcmod.read().split('\n')
 
-    for line in ffrcmod:
-        if line.startswith(component):
-            while not empty_lines:
-                temp_line = ffrcmod.readline().strip()
-                if len(temp_line) > 0:
-                    llist.append(temp_line)
-                else:
-                    empty_lines += 1
-                    break
-        elif empty_lines > 0:
-            break    
+    for line in lines:
+        stripped = line.strip()
+        if current is None:
+            # headers are matched by prefix, e.g. DIHEDRAL opens DIHE
+            current = next((s for s in sections if line.startswith(s)), None)
+        elif stripped:
+            sections[current].append(stripped)
+        else:
+            current = None
 
-    ffrcmod.close()
-
-    return(llist)
+    return(sections)
 
 
 # extract
-BOND     = extract(fname, "BOND")
-ANGLE    = extract(fname, "ANGLE")
-DIHE     = extract(fname, "DIHE")
-IMPROPER = extract(fname, "IMPROPER")
-NONBON   = extract(fname, "NONBON")
-
-#print
-for item in BOND:
-    ommb = fmm._bond(item)
-print("")
-
-for item in ANGLE:
-    ommb = fmm._angle(item)
-print("")
-
-for item in DIHE:
-    ommb = fmm._dihedral(item)
-print("")
-
-for item in IMPROPER:
-    ommb = fmm._improper(item)
-print("")
-
-for item in NONBON:
-    ommb = fmm._nonbonding(item)
-print("")
+sections = extract(fname)
+BOND     = sections["BOND"]
+ANGLE    = sections["ANGLE"]
+DIHE     = sections["DIHE"]
+IMPROPER = sections["IMPROPER"]
+NONBON   = sections["NONBON"]
+
+#print: each block is converted in a single call
+out = []
+for block, convert in ((BOND,     fmm._bond_batch),
+                       (ANGLE,    fmm._angle_batch),
+                       (DIHE,     fmm._dihedral_batch),
+                       (IMPROPER, fmm._improper_batch),
+                       (NONBON,   fmm._nonbonding_batch)):
+    if block:
+        out.append(convert(block))
+    out.append("")
+
+# write everything through one 256 KiB buffer, so even a terminal sees a
+# handful of write(2) calls instead of one per line. streams without a
+# binary layer (e.g. under contextlib.redirect_stdout) are written directly
+if hasattr(sys.stdout, 'buffer'):
+    sys.stdout.flush()
+    stdout = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, 256*1024),
+                              encoding=sys.stdout.encoding, errors=sys.stdout.errors)
+    stdout.writelines(line + "\n" for line in out)
+    stdout.detach().detach()    # flush once, leave sys.stdout open
+else:
+    sys.stdout.writelines(line + "\n" for line in out)
@@ -15,6 +15,7 @@ USAGE: script.py <lig.param>
 @Author: Madhuranga Rathnayake
 """
 import lammps2omm as lmm
+import io
 import sys
 
 # grey colour bash text variable. marks unconverted lines in less pronounced light grey colour.
@@ -31,17 +32,53 @@ else:
     sys.exit()
 
 
-# start conversion
+# coeff keyword -> converter for the whole block of such lines
+DISPATCH = {
+    "bond_coeff":     lmm._bond_batch,
+    "angle_coeff":    lmm._angle_batch,
+    "dihedral_coeff": lmm._dihedral_batch,
+}
+
+# start conversion. first pass sorts coeff lines by kind and keeps their
+# position in the output; everything else is handled straight away.
+out    = []
+blocks = {keyword: [] for keyword in DISPATCH}
 with open(fname, 'r') as params:
-    for line in params:
-        cleaned_line = line.strip()
-        if len(cleaned_line) >= 1 and cleaned_line.split()[0] == "bond_coeff":
-            omm_out = lmm._bond(cleaned_line)
-        elif len(cleaned_line) >= 1 and cleaned_line.split()[0] == "angle_coeff":
-            omm_out = lmm._angle(cleaned_line)
-        elif len(cleaned_line) >= 1 and cleaned_line.split()[0] == "dihedral_coeff":
-            omm_out = lmm._dihedral(cleaned_line)
-        elif len(cleaned_line) >= 1 and cleaned_line.split()[0] == "pair_coeff":
-            omm_out = lmm._nonbonding(cleaned_line)
-        else:
-            print(CGREY+cleaned_line+CEND)
+    lines = params.read().split('\n')
+# a trailing newline leaves an empty last item that iterating the file
+# never yielded; drop it so it is not echoed as an extra grey line
+if not lines[-1]:
+    lines.pop()
+
+for line in lines:
+    cleaned_line = line.strip()
+    # only the first token is needed, don't split the whole line
+    keyword = cleaned_line.split(None, 1)[0] if cleaned_line else ""
+    block = blocks.get(keyword)
+    if block is not None:
+        block.append((len(out), cleaned_line))
+        out.append(None)
+    elif keyword == "pair_coeff":
+        out.append(lmm._nonbonding(cleaned_line))
+    else:
+        out.append(CGREY+cleaned_line+CEND)
+
+# second pass converts each kind in a single call and puts the converted
+# lines back in place
+for keyword, convert in DISPATCH.items():
+    if blocks[keyword]:
+        positions, lines = zip(*blocks[keyword])
+        for i, omm_out in zip(positions, convert(lines)):
+            out[i] = omm_out
+
+# write everything through one 256 KiB buffer, so even a terminal sees a
+# handful of write(2) calls instead of one per line. streams without a
+# binary layer (e.g. under contextlib.redirect_stdout) are written directly
+if hasattr(sys.stdout, 'buffer'):
+    sys.stdout.flush()
+    stdout = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, 256*1024),
+                              encoding=sys.stdout.encoding, errors=sys.stdout.errors)
+    stdout.writelines(line + "\n" for line in out)
+    stdout.detach().detach()    # flush once, leave sys.stdout open
+else:
+    sys.stdout.writelines(line + "\n" for line in out)
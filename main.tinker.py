@@ -18,6 +18,7 @@ USAGE: script.py <tinker-parameter-file.prm>z
 """
 
 import tinker2omm as t2omm
+import io
 import sys
 
 # check system arguments and extract input tinker parameter file
@@ -33,79 +34,89 @@ else:
 CGREY = '\33[90m'
 CEND = '\33[0m'
 
-# open Tinker parameter file to read
-file = open(input_file, 'r')
-
-# read file line by line
-for line in file:
+# Tinker keyword -> converter. keywords are matched exactly, so e.g. anglep
+# lines are not converted as plain angles. multipole is handled separately
+# as it spans several lines.
+DISPATCH = {
+    'strbnd':   t2omm._strbend,
+    'vdw':      t2omm._vdw,
+    'opbend':   t2omm._opbend,
+    'pitors':   t2omm._pitors,
+    'polarize': t2omm._polarize,
+}
+
+# the most frequent records are collected over the whole file and each kind
+# is converted with a single call once the file has been read
+BATCH = {
+    'bond':     t2omm._bond_batch,
+    'angle':    t2omm._angle_batch,
+    'torsion':  t2omm._torsion_batch,
+}
+
+# converted and skipped lines are collected and written to stdout at the end
+out    = []
+blocks = {keyword: [] for keyword in BATCH}
+
+# read and decode the whole Tinker parameter file at once
+with open(input_file, 'r') as file:
+    lines = iter(file.read().split('\n'))
+
+# walk the file line by line
+for line in lines:
     # strip parameters and remove line breaks
     line_in_list = line.strip().split()
 
     # skip comments and lines with less than 3 items
-    # if True, skips the loop
     if len(line_in_list) < 3 or line_in_list[0].startswith('#'):
-        pass
-
-    # convert bonds
-    elif line_in_list[0].startswith('bond'):
-        omm_bond_param = t2omm._bond(line_in_list)
-        print(omm_bond_param)
-
-    # convert angles
-    elif line_in_list[0].startswith('angle'):
-        omm_angle_param = t2omm._angle(line_in_list)
-        print(omm_angle_param)
-
-    # convert Stretch-Bends
-    elif line_in_list[0].startswith('strbnd'):
-        omm_strbnd_param = t2omm._strbend(line_in_list)
-        print(omm_strbnd_param)
-
-    # convert torsions
-    elif line_in_list[0].startswith('torsion'):
-        omm_torsion_param = t2omm._torsion(line_in_list)
-        print(omm_torsion_param)
-
-    # convert vdw
-    elif line_in_list[0].startswith('vdw'):
-        omm_vdw_param = t2omm._vdw(line_in_list)
-        print(omm_vdw_param)
-
-    # convert out of plane bending
-    elif line_in_list[0].startswith('opbend'):
-        omm_opbend_param = t2omm._opbend(line_in_list)
-        print(omm_opbend_param)
-
-    # convert pitorsions
-    elif line_in_list[0].startswith('pitors'):
-        omm_pitors_param = t2omm._pitors(line_in_list)
-        print(omm_pitors_param)
+        continue
+
+    keyword = line_in_list[0]
 
     # convert multipoles - monopole, dipole and quadrapoles
-    elif line_in_list[0].startswith('multipole'):
-        dipoles = file.readline().strip().split()
-        multipoles1 = file.readline().strip().split()
-        multipoles2 = file.readline().strip().split()
-        multipoles3 = file.readline().strip().split()
+    if keyword == 'multipole':
+        dipoles = next(lines, '').strip().split()
+        multipoles1 = next(lines, '').strip().split()
+        multipoles2 = next(lines, '').strip().split()
+        multipoles3 = next(lines, '').strip().split()
 
         # creates a single list with all monopole + dipole + quadrapoles
         multipoles_list = line_in_list + dipoles + multipoles1 +multipoles2 + multipoles3
 
-        omm_multipoles = t2omm._multipole(multipoles_list)
-        print(omm_multipoles)
-
-    # convert polarizability
-    elif line_in_list[0].startswith('polarize'):
-        omm_polarize_param = t2omm._polarize(line_in_list)
-        print(omm_polarize_param)
-
-    elif line_in_list[0].startswith('opbend'):
-        omm_opbend_param = t2omm._opbend(line_in_list)
-        print(omm_opbend_param)
-    
-    # print skipped lines in light grey colour
+        out.append(t2omm._multipole(multipoles_list))
+        continue
+
+    # bonds, angles and torsions keep their position in the output and are
+    # converted after the whole file has been read
+    block = blocks.get(keyword)
+    if block is not None:
+        block.append((len(out), line_in_list))
+        out.append(None)
+        continue
+
+    # convert stretch-bends, vdw, ... with a single lookup
+    convert = DISPATCH.get(keyword)
+    if convert is None:
+        # print skipped lines in light grey colour
+        out.append(CGREY + 'skipping line:  ' + line.strip() + CEND)
     else:
-        print(CGREY + 'skipping line:  ' + line.strip() + CEND)
-
-# done reading, close the parameter file
-file.close()
\ No newline at end of file
+        out.append(convert(line_in_list))
+
+# convert each collected kind in a single call and put the converted lines
+# back in place
+for keyword, convert in BATCH.items():
+    if blocks[keyword]:
+        positions, llists = zip(*blocks[keyword])
+        for i, omm_out in zip(positions, convert(llists)):
+            out[i] = omm_out
+
+# write everything through one 256 KiB buffer, so even a terminal sees a
+# handful of write(2) calls instead of one per line. streams without a
+# binary layer (e.g. under contextlib.redirect_stdout) are written directly
+if hasattr(sys.stdout, 'buffer'):
+    sys.stdout.flush()
+    stdout = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, 256*1024),
+                              encoding=sys.stdout.encoding, errors=sys.stdout.errors)
+    stdout.writelines(line + '\n' for line in out)
+    stdout.detach().detach()    # flush once, leave sys.stdout open
+else:
+    sys.stdout.writelines(line + '\n' for line in out)
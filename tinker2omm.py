@@ -22,10 +22,27 @@ Doctests have been implemented and forced to print in verbose mode.
 from math import pi
 
 radian = 57.2957795130 # 1 rad = 57.2957795130 degree   or could use math.radian()
-
-
-def _atom(llist):
-    pass
+bohr   = 0.52917720859 # 1 bohr = 0.52917720859 Ang
+
+# unit conversion factors, folded into single multipliers
+_DEG2RAD           = pi/180                   # degree -> rad
+_BOND_K_TINKER     = 4.184/0.01               # kcal/(mol*Å^2) -> kJ/(mol.nm^2) (418.4)
+_ANGLE_K_TINKER    = 4.184/(180/pi)**2        # kcal/(mol*rad^2) -> kJ/(mol*degree^2)
+_STRBND_K          = 4.184*10/(180/pi)        # kcal/(ang.rad.mol) -> kJ/(nm.degree.mol)
+_TORSION_K         = 4.184/2                  # kcal -> kJ/2
+_OPBEND_K          = 4.184/(radian*radian)    # kcal/(mol*rad^2) -> kJ/(mol*degree^2)
+_PITORS_K          = 4.184*1.0                # kcal -> kJ, piTorsionUnit = 1.0
+_DIPOLE_FACTOR     = bohr*0.1                 # e.bohr -> e.nm
+_QUADRUPOLE_FACTOR = 0.01*bohr*bohr/3.0       # (e.bohr^2)/3 -> (e.nm^2)/3
+
+# templates shared by the per-line and block converters below
+_BOND_FMT    = '<Bond class1="{}" class2="{}" length="{:.6f}" k="{:.2f}" />'.format
+_ANGLE_FMT   = {  # one template per number of angles
+    1: '<Angle class1="{}" class2="{}" class3="{}" k="{:.9e}" angle1="{}" />'.format,
+    2: '<Angle class1="{}" class2="{}" class3="{}" k="{:.9e}" angle1="{}" angle2="{}" />'.format,
+    3: '<Angle class1="{}" class2="{}" class3="{}" k="{:.9e}" angle1="{}" angle2="{}" angle3="{}" />'.format,
+}
+_TORSION_FMT = '<Proper class1="{}" class2="{}" class3="{}" class4="{}"   k1="{:.6f}" phase1="{:.12f}" periodicity1="{}"   k2="{:.6f}" phase2="{:.12f}" periodicity2="{}"   k3="{:.6f}" phase3="{:.12f}" periodicity3="{}" />'.format
 
 
 def _vdw(llist):
@@ -48,10 +65,27 @@ def _vdw(llist):
         reduction = llist[4]
     else:
         reduction = 1.00
-    omm_vdw = '<Vdw class="{}" sigma="{:.4f}" epsilon="{:.6f}" reduction="{}" />'.format(atom_class, sigma, epsilon, reduction)
+    omm_vdw = f'<Vdw class="{atom_class}" sigma="{sigma:.4f}" epsilon="{epsilon:.6f}" reduction="{reduction}" />'
     return(omm_vdw)
 
 
+def _bond_converted(llist):
+    """ (list) -> tuple
+
+    Conversion step of _bond(): atom classes and converted parameters
+    (class1, class2, bond length (nm), k (kJ/(mol.nm^2))).
+
+    >>> c1, c2, length, k = _bond_converted(['bond', '6', '16', '341.00', '1.1120'])
+    >>> c1, c2, '%.6f' % length, '%.2f' % k
+    ('6', '16', '0.111200', '142674.40')
+    """
+    _, atom_class1, atom_class2, k, bond_length = llist[:5]
+    k = float(k) * _BOND_K_TINKER
+    bond_length = float(bond_length) * 0.1
+
+    return((atom_class1, atom_class2, bond_length, k))
+
+
 def _bond(llist):
     """ (list) -> string
 
@@ -65,14 +99,53 @@ def _bond(llist):
 
     Doctesting inputs and outputs were taken from amoebabio09.prm and amoeba2009.xml
     """
-    atom_class1 = llist[1]
-    atom_class2 = llist[2]
-    k = float(llist[3]) * 4.184 / 0.01
-    bond_length = float(llist[4]) * 0.1
+    return(_BOND_FMT(*_bond_converted(llist)))
+
+
+def _bond_batch(llists):
+    """ (list of lists) -> list of strings
+
+    Block version of _bond(). All records are converted first, the results
+    are then formatted in a separate pass.
+
+    >>> _bond_batch([['bond', '6', '16', '341.00', '1.1120']])
+    ['<Bond class1="6" class2="16" length="0.111200" k="142674.40" />']
+    """
+    rows = [_bond_converted(llist) for llist in llists]
 
-    omm_bond = '<Bond class1="{}" class2="{}" length="{:.6f}" k="{:.2f}" />'.format(atom_class1, atom_class2, bond_length, k)
+    return([_BOND_FMT(*row) for row in rows])
 
-    return(omm_bond)
+
+def _angle_converted(llist):
+    """ (list) -> tuple
+
+    Conversion step of _angle(): atom classes, converted force constant and
+    the tuple of (one to three) angles, (class1, class2, class3, k, angles).
+
+    >>> c1, c2, c3, k, angles = _angle_converted(['angle', '53', '54', '54', '69.20', '114.00'])
+    >>> c1, c2, c3, '%.9e' % k, angles
+    ('53', '54', '54', '8.819673448e-02', ('114.00',))
+    """
+    if len(llist) == 6:
+        _, atom_class1, atom_class2, atom_class3, k, angle = llist
+        angles = (angle,)
+
+    elif len(llist) == 8:
+        _, atom_class1, atom_class2, atom_class3, k, angle1, angle2, _ = llist
+        angles = (angle1, angle2)
+
+    elif len(llist) == 9:
+        _, atom_class1, atom_class2, atom_class3, k, angle1, angle2, angle3, _ = llist
+        angles = (angle1, angle2, angle3)
+
+    else:
+        print('something wrong with AMOEBA angles!')
+        print(llist)
+        raise ValueError('unexpected number of fields in angle record')
+
+    k = float(k) * _ANGLE_K_TINKER
+
+    return((atom_class1, atom_class2, atom_class3, k, angles))
 
 
 def _angle(llist):
@@ -89,41 +162,23 @@ def _angle(llist):
     Doctesting inputs and outputs were taken from amoebabio09.prm and amoeba2009.xml
     # TODO: there can be multiple angles(implemented). --> add doc test
     """ 
-    if len(llist) == 6:   
-        atom_class1 = llist[1]
-        atom_class2 = llist[2]
-        atom_class3 = llist[3]
-        k = float(llist[4]) * 4.184/(180/pi)**2
-        angle = llist[5]
-
-        omm_angle = '<Angle class1="{}" class2="{}" class3="{}" k="{:.9e}" angle1="{}" />'.format(atom_class1, atom_class2, atom_class3, k, angle)
-    
-    elif len(llist) == 8:
-        atom_class1 = llist[1]
-        atom_class2 = llist[2]
-        atom_class3 = llist[3]
-        k = float(llist[4]) * 4.184/(180/pi)**2
-        angle1 = llist[5]
-        angle2 = llist[6]
+    atom_class1, atom_class2, atom_class3, k, angles = _angle_converted(llist)
 
-        omm_angle = '<Angle class1="{}" class2="{}" class3="{}" k="{:.9e}" angle1="{}" angle2="{}" />'.format(atom_class1, atom_class2, atom_class3, k, angle1, angle2)
+    return(_ANGLE_FMT[len(angles)](atom_class1, atom_class2, atom_class3, k, *angles))
 
-    elif len(llist) == 9:
-        atom_class1 = llist[1]
-        atom_class2 = llist[2]
-        atom_class3 = llist[3]
-        k = float(llist[4]) * 4.184/(180/pi)**2
-        angle1 = llist[5]
-        angle2 = llist[6]
-        angle3 = llist[7]
-
-        omm_angle = '<Angle class1="{}" class2="{}" class3="{}" k="{:.9e}" angle1="{}" angle2="{}" angle3="{}" />'.format(atom_class1, atom_class2, atom_class3, k, angle1, angle2, angle3)
-    
-    else:
-        print('something wrong with AMOEBA angles!')
-        print(llist)
 
-    return(omm_angle)
+def _angle_batch(llists):
+    """ (list of lists) -> list of strings
+
+    Block version of _angle(). All records are converted first, the results
+    are then formatted in a separate pass.
+
+    >>> _angle_batch([['angle', '53', '54', '54', '69.20', '114.00']])
+    ['<Angle class1="53" class2="54" class3="54" k="8.819673448e-02" angle1="114.00" />']
+    """
+    rows = [_angle_converted(llist) for llist in llists]
+
+    return([_ANGLE_FMT[len(angles)](c1, c2, c3, k, *angles) for c1, c2, c3, k, angles in rows])
 
 
 def _strbend(llist):
@@ -141,14 +196,39 @@ def _strbend(llist):
     atom_class1 = llist[1]
     atom_class2 = llist[2]
     atom_class3 = llist[3]
-    k1 = float(llist[4]) * (4.184*10 / (180/pi))
-    k2 = float(llist[5]) * (4.184*10 / (180/pi))
+    k1 = float(llist[4]) * _STRBND_K
+    k2 = float(llist[5]) * _STRBND_K
 
-    omm_StretchBend = '<StretchBend class1="{}" class2="{}" class3="{}" k1="{:.9e}" k2="{:.9e}" />'.format(atom_class1, atom_class2, atom_class3, k1, k2)
+    omm_StretchBend = f'<StretchBend class1="{atom_class1}" class2="{atom_class2}" class3="{atom_class3}" k1="{k1:.9e}" k2="{k2:.9e}" />'
 
     return(omm_StretchBend)
 
 
+def _torsion_converted(llist):
+    """ (list) -> tuple
+
+    Conversion step of _torsion(): atom classes followed by converted
+    (k, phase, periodicity) of the three torsion terms.
+
+    >>> row = _torsion_converted(['torsion', '39', '1', '8', '8', '0.982', '0.0', '1', '0.994', '180.0', '2', '0.170', '0.0', '3'])
+    >>> row[:4], ['%.6f' % k for k in row[4::3]], ['%.12f' % p for p in row[5::3]], row[6::3]
+    (('39', '1', '8', '8'), ['2.054344', '2.079448', '0.355640'], ['0.000000000000', '3.141592653590', '0.000000000000'], ('1', '2', '3'))
+    """
+    (atom_class1, atom_class2, atom_class3, atom_class4,
+     k1, phase1, periodicity1,
+     k2, phase2, periodicity2,
+     k3, phase3, periodicity3) = llist[1:14]
+
+    # parse and scale each group of terms with builtins only
+    k1, k2, k3 = map(_TORSION_K.__mul__, map(float, (k1, k2, k3)))
+    phase1, phase2, phase3 = map(_DEG2RAD.__mul__, map(float, (phase1, phase2, phase3)))
+
+    return((atom_class1, atom_class2, atom_class3, atom_class4,
+            k1, phase1, periodicity1,
+            k2, phase2, periodicity2,
+            k3, phase3, periodicity3))
+
+
 def _torsion(llist):
     """ (list) -> string
 
@@ -163,26 +243,21 @@ def _torsion(llist):
     
     Doctesting inputs and outputs were taken from amoebabio09.prm and amoeba2009.xml
     """
-    atom_class1 = llist[1]
-    atom_class2 = llist[2]
-    atom_class3 = llist[3]
-    atom_class4 = llist[4]
+    return(_TORSION_FMT(*_torsion_converted(llist)))
 
-    k1 = float(llist[5]) * (4.184/2)
-    phase1 = float(llist[6]) * (pi/180)
-    periodicity1 = llist[7]
 
-    k2 = float(llist[8]) * (4.184/2)
-    phase2 = float(llist[9]) * (pi/180)
-    periodicity2 = llist[10]
+def _torsion_batch(llists):
+    """ (list of lists) -> list of strings
 
-    k3 = float(llist[11]) * (4.184/2)
-    phase3 = float(llist[12]) * (pi/180)
-    periodicity3 = llist[13]
+    Block version of _torsion(). All records are converted first, the
+    results are then formatted in a separate pass.
 
-    omm_torsion = '<Proper class1="{}" class2="{}" class3="{}" class4="{}"   k1="{:.6f}" phase1="{:.12f}" periodicity1="{}"   k2="{:.6f}" phase2="{:.12f}" periodicity2="{}"   k3="{:.6f}" phase3="{:.12f}" periodicity3="{}" />'.format(atom_class1, atom_class2, atom_class3, atom_class4, k1, phase1, periodicity1, k2, phase2, periodicity2, k3, phase3, periodicity3)
+    >>> _torsion_batch([['torsion', '39', '1', '8', '8', '0.982', '0.0', '1', '0.994', '180.0', '2', '0.170', '0.0', '3']])
+    ['<Proper class1="39" class2="1" class3="8" class4="8"   k1="2.054344" phase1="0.000000000000" periodicity1="1"   k2="2.079448" phase2="3.141592653590" periodicity2="2"   k3="0.355640" phase3="0.000000000000" periodicity3="3" />']
+    """
+    rows = [_torsion_converted(llist) for llist in llists]
 
-    return(omm_torsion)
+    return([_TORSION_FMT(*row) for row in rows])
 
 
 def _polarize(llist):
@@ -208,16 +283,16 @@ def _polarize(llist):
         polarizable_groups = []
 
     if not polarizable_groups:
-        omm_polarize = '<Polarize type="{}" polarizability="{:.6f}" thole="{}" />'.format(atom_class1, polarizability, thole_damping_factor)
+        omm_polarize = f'<Polarize type="{atom_class1}" polarizability="{polarizability:.6f}" thole="{thole_damping_factor}" />'
 
     elif len(polarizable_groups) == 1:
-        omm_polarize = '<Polarize type="{}" polarizability="{:.6f}" thole="{}" pgrp1="{}" />'.format(atom_class1, polarizability, thole_damping_factor, polarizable_groups[0])
+        omm_polarize = f'<Polarize type="{atom_class1}" polarizability="{polarizability:.6f}" thole="{thole_damping_factor}" pgrp1="{polarizable_groups[0]}" />'
     
     elif len(llist) == 6:
-        omm_polarize = '<Polarize type="{}" polarizability="{:.6f}" thole="{}" pgrp1="{}" pgrp2="{}" />'.format(atom_class1, polarizability, thole_damping_factor, polarizable_groups[0], polarizable_groups[1])
+        omm_polarize = f'<Polarize type="{atom_class1}" polarizability="{polarizability:.6f}" thole="{thole_damping_factor}" pgrp1="{polarizable_groups[0]}" pgrp2="{polarizable_groups[1]}" />'
 
     elif len(llist) == 7:
-        omm_polarize = '<Polarize type="{}" polarizability="{:.6f}" thole="{}" pgrp1="{}" pgrp2="{}" pgrp3="{}" />'.format(atom_class1, polarizability, thole_damping_factor, polarizable_groups[0], polarizable_groups[1], polarizable_groups[2])
+        omm_polarize = f'<Polarize type="{atom_class1}" polarizability="{polarizability:.6f}" thole="{thole_damping_factor}" pgrp1="{polarizable_groups[0]}" pgrp2="{polarizable_groups[1]}" pgrp3="{polarizable_groups[2]}" />'
     else:
         print("error in polarize parameters")
         print(llist)
@@ -245,48 +320,25 @@ def _multipole(llist):
     Doctesting inputs and outputs were taken from amoebabio09.prm and amoeba2009.xml
     # TODO: only z-then-x frame parameter conversion is available. implement parameter converion for other local frames
     """
-    bohr = 0.52917720859
-
     if len(llist) == 14:
-        atom = llist[1]
-        kz = llist[2]
-        kx = llist[3]
-
-        c0 = float(llist[4])
+        _, atom, kz, kx, c0 = llist[:5]
+        dipoles, quadrupoles = llist[5:8], llist[8:14]
 
-        d1 = float(llist[5]) * bohr*0.1
-        d2 = float(llist[6]) * bohr*0.1
-        d3 = float(llist[7]) * bohr*0.1
+        c0 = float(c0)
+        d1, d2, d3 = map(_DIPOLE_FACTOR.__mul__, map(float, dipoles))
+        q11, q21, q22, q31, q32, q33 = map(_QUADRUPOLE_FACTOR.__mul__, map(float, quadrupoles))
 
-        q11 = float(llist[8]) * 0.01*bohr*bohr/3.0
-        q21 = float(llist[9]) * 0.01*bohr*bohr/3.0
-        q22 = float(llist[10]) * 0.01*bohr*bohr/3.0
-        q31 = float(llist[11]) * 0.01*bohr*bohr/3.0
-        q32 = float(llist[12]) * 0.01*bohr*bohr/3.0
-        q33 = float(llist[13]) * 0.01*bohr*bohr/3.0
-
-        omm_multipole = '<Multipole type="{}" kz="{}" kx="{}" c0="{:.6f}" d1="{:.12e}" d2="{:.12e}" d3="{:.12e}" q11="{:.12e}" q21="{:.12e}" q22="{:.12e}" q31="{:.12e}" q32="{:.12e}" q33="{:.12e}" />'.format(atom, kz, kx, c0, d1, d2, d3, q11, q21, q22, q31, q32, q33)
+        omm_multipole = f'<Multipole type="{atom}" kz="{kz}" kx="{kx}" c0="{c0:.6f}" d1="{d1:.12e}" d2="{d2:.12e}" d3="{d3:.12e}" q11="{q11:.12e}" q21="{q21:.12e}" q22="{q22:.12e}" q31="{q31:.12e}" q32="{q32:.12e}" q33="{q33:.12e}" />'
     
     elif len(llist) == 15:
-        atom = llist[1]
-        kz = llist[2]
-        kx = llist[3]
-        ky = llist[4]
-
-        c0 = float(llist[5])
+        _, atom, kz, kx, ky, c0 = llist[:6]
+        dipoles, quadrupoles = llist[6:9], llist[9:15]
 
-        d1 = float(llist[6]) * bohr*0.1
-        d2 = float(llist[7]) * bohr*0.1
-        d3 = float(llist[8]) * bohr*0.1
+        c0 = float(c0)
+        d1, d2, d3 = map(_DIPOLE_FACTOR.__mul__, map(float, dipoles))
+        q11, q21, q22, q31, q32, q33 = map(_QUADRUPOLE_FACTOR.__mul__, map(float, quadrupoles))
 
-        q11 = float(llist[9]) * 0.01*bohr*bohr/3.0
-        q21 = float(llist[10]) * 0.01*bohr*bohr/3.0
-        q22 = float(llist[11]) * 0.01*bohr*bohr/3.0
-        q31 = float(llist[12]) * 0.01*bohr*bohr/3.0
-        q32 = float(llist[13]) * 0.01*bohr*bohr/3.0
-        q33 = float(llist[14]) * 0.01*bohr*bohr/3.0
-
-        omm_multipole = '<Multipole type="{}" kz="{}" kx="{}" ky="{}" c0="{:.6f}" d1="{:.12e}" d2="{:.12e}" d3="{:.12e}" q11="{:.12e}" q21="{:.12e}" q22="{:.12e}" q31="{:.12e}" q32="{:.12e}" q33="{:.12e}" />'.format(atom, kz, kx, ky, c0, d1, d2, d3, q11, q21, q22, q31, q32, q33)
+        omm_multipole = f'<Multipole type="{atom}" kz="{kz}" kx="{kx}" ky="{ky}" c0="{c0:.6f}" d1="{d1:.12e}" d2="{d2:.12e}" d3="{d3:.12e}" q11="{q11:.12e}" q21="{q21:.12e}" q22="{q22:.12e}" q31="{q31:.12e}" q32="{q32:.12e}" q33="{q33:.12e}" />'
 
     return(omm_multipole)
 
@@ -305,10 +357,9 @@ def _opbend(llist):
     atom_class3 = llist[3]
     atom_class4 = llist[4]
 
-    radian2 = 4.184/(radian*radian)
-    k = float(llist[5]) * radian2
+    k = float(llist[5]) * _OPBEND_K
 
-    omm_opbend = '<Angle class1="{}" class2="{}" class3="{}" class4="{}" k="{:.9e}"/>'.format(atom_class1, atom_class2, atom_class3, atom_class4, k)
+    omm_opbend = f'<Angle class1="{atom_class1}" class2="{atom_class2}" class3="{atom_class3}" class4="{atom_class4}" k="{k:.9e}"/>'
 
     return(omm_opbend)
 
@@ -321,16 +372,12 @@ def _pitors(llist):
     >>> _pitors(llist)
     '<PiTorsion class1="1" class2="3" k="28.6604" />'
     '''
-    
-    piTorsionUnit = 1.0
-    conversion = 4.184*piTorsionUnit
-
     atom_class1 = llist[1]
     atom_class2 = llist[2]
 
-    k = float(llist[3])*conversion
+    k = float(llist[3])*_PITORS_K
 
-    omm_pitors = '<PiTorsion class1="{}" class2="{}" k="{:.4f}" />'.format(atom_class1, atom_class2, k)
+    omm_pitors = f'<PiTorsion class1="{atom_class1}" class2="{atom_class2}" k="{k:.4f}" />'
 
     return(omm_pitors)
 